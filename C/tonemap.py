@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+
+# Turn the grayscale TIFF computed by zeros into a colored PNG image
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from polyroots import ToneMapper, color_list
+
+# Main program
+if __name__ == '__main__':
+    ## Process command line
+    parser = argparse.ArgumentParser(description = "Tone map an image of complex zeroes computed by zeros")
+    parser.add_argument('infile', help='input file (32-bit grayscale TIFF)')
+    parser.add_argument('outfile', help='output file (PNG)')
+    parser.add_argument('--log', dest='log', default=400000.0, type=float, help='strength of logarithmic scaling')
+    parser.add_argument('--black', dest='black', default=2.0, type=float, help='percentage of pixels that become black')
+    parser.add_argument('--white', dest='white', default=1.0, type=float, help='percentage of pixels that become white')
+    parser.add_argument('--fill', dest='fill', default=(255,165,0), type=(lambda s: color_list(s, int)[0]), help='tint color (default orange, 255,165,0)')
+    parser.add_argument('--tint', dest='tint', default=100.0, type=float, help='tint strength in percent')
+    parser.add_argument('--workers', dest='workers', default=None, type=int, help='number of threads')
+    args = parser.parse_args()
+    mapper = ToneMapper(log=args.log, black=args.black, white=args.white,
+                        fill=args.fill, tint=args.tint, workers=args.workers)
+    mapper.convert(args.infile, args.outfile)
@@ -1,6 +1,10 @@
 #!/usr/bin/python
 
-from zeroes import Zeroes
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from polyroots import Sweep
 
 def line(a,b,n):
     """Retun a list of n points on the segment between points a and b."""
@@ -14,11 +18,10 @@ def line(a,b,n):
         lst.append((x,y))
     return lst
 
-for (i,c) in enumerate(line((1.0, 1.0), (-1.0, 1.0), 300)):
-    nicle = Zeroes(xmin=-2.25, xmax=1.75, ymin=-2.0, ymax=2.0, coeffs=c,
-                   xres=800, degrees=tuple(range(12)), colors=((0,0,255),(255,255,255)))
-    nicle.draw_roots()
-    filename = "movie{:03d}.png".format(i)
-    print("Saving {0}".format(filename))
-    with open(filename, "wb") as f: nicle.save_image(f)
-
+# The frames are drawn in parallel and streamed to ffmpeg. If the program is
+# interrupted, run it again and it will continue where it left off.
+if __name__ == '__main__':
+    sweep = Sweep(line((1.0, 1.0), (-1.0, 1.0), 300),
+                  xmin=-2.25, xmax=1.75, ymin=-2.0, ymax=2.0,
+                  xres=800, degrees=tuple(range(12)), colors=((0,0,255),(255,255,255)))
+    sweep.render(sys.argv[1] if len(sys.argv) > 1 else "movie.mpg")
@@ -9,6 +9,8 @@ pic="algebraic-numbers.png"
 # These will fail if the output files already exist, and the script will
 # proceed to generation of the image below. Thus it is safe to
 # re-run the batch script, as it won't over-write previously computed files.
+# All the zeros are saved (add --prune to save only those visible in $opts),
+# so that the files can be drawn later with a different --decay.
 
 ./algebraic.py $opts --save roots-1-100.dat --coeff 100 --degrees 1
 ./algebraic.py $opts --save roots-2-100.dat --coeff 100 --degrees 2
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+
+# Serve zoomable tiles of precomputed algebraic numbers over HTTP
+
+import argparse
+import hashlib
+import io
+import multiprocessing
+import os
+import pickle
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import numpy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from polyroots import AlgebraicNumbers, color_list
+
+TILE = 256 # size of a tile in pixels
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<title>Algebraic numbers</title>
+<link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css"/>
+<script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
+<style>html, body, #map {{ height: 100%; margin: 0; background: black; }}</style>
+</head>
+<body>
+<div id="map"></div>
+<script>
+var map = L.map('map', {{crs: L.CRS.Simple, minZoom: 0, maxZoom: {max_zoom}}});
+L.tileLayer('/{{z}}/{{x}}/{{y}}.png', {{tileSize: {tile}, noWrap: true, maxZoom: {max_zoom}}}).addTo(map);
+map.setView([-{tile} / 2, {tile} / 2], 1);
+</script>
+</body>
+</html>
+"""
+
+## Roots loaded from files
+
+class RootStore():
+    """All roots loaded from the given files, grouped into classes of similar star sizes
+       and sorted by their real parts within each class, so that the roots which are
+       visible in a window can be found quickly: a few large stars do not widen the
+       search among the many small ones. The roots are kept in compact arrays, with the
+       coefficients of all polynomials packed into one array, so that worker processes
+       forked from the loading process share them."""
+
+    def __init__(self, files, radius, decay):
+        real = []
+        imag = []
+        owner = [] # index of the polynomial of each root
+        coeffs = []
+        start = [] # where the coefficients of each polynomial start
+        n = 0 # number of polynomials so far
+        offset = 0 # number of coefficients so far
+        for name in files:
+            with open(name, 'rb') as fh:
+                roots = pickle.load(fh)
+            real.append(numpy.fromiter((r[0] for r in roots), dtype=float, count=len(roots)))
+            imag.append(numpy.fromiter((r[1] for r in roots), dtype=float, count=len(roots)))
+            k = numpy.empty(len(roots), dtype=numpy.int64)
+            flat = []
+            last = None
+            for (j, (_x, _y, poly)) in enumerate(roots):
+                # The roots of a polynomial are saved one after another
+                if poly != last:
+                    start.append(offset)
+                    flat.extend(poly)
+                    offset += len(poly)
+                    n += 1
+                    last = poly
+                k[j] = n - 1
+            owner.append(k)
+            coeffs.append(numpy.array(flat, dtype=numpy.int32))
+            del roots
+        self.coeffs = numpy.concatenate(coeffs) if coeffs else numpy.zeros(0, dtype=numpy.int32)
+        self.start = numpy.array(start + [offset], dtype=numpy.int64)
+        real = numpy.concatenate(real) if real else numpy.zeros(0)
+        imag = numpy.concatenate(imag) if imag else numpy.zeros(0)
+        owner = numpy.concatenate(owner) if owner else numpy.zeros(0, dtype=numpy.int64)
+        # radius of the star drawn for each root, computed as by star_radius
+        if n > 0:
+            weights = numpy.add.reduceat(numpy.abs(self.coeffs), self.start[:-1]).astype(float)
+            size = numpy.maximum(0.0001, radius / weights ** decay)[owner]
+            lengths = numpy.diff(self.start)
+            self.degree_min = int(lengths.min()) - 1
+            self.degree_max = int(lengths.max()) - 1
+        else:
+            size = numpy.zeros(0)
+            self.degree_min = self.degree_max = 0
+        # Star sizes within a factor of 2 of each other are in the same class
+        group = -numpy.floor(numpy.log2(numpy.maximum(size, 1e-300))).astype(numpy.int64)
+        order = numpy.lexsort((real, group))
+        (self.real, self.imag, self.owner, self.size) = (real[order], imag[order], owner[order], size[order])
+        group = group[order]
+        bounds = numpy.flatnonzero(numpy.diff(group)) + 1
+        self.classes = [(int(lo), int(hi), float(self.size[lo:hi].max())) # (first root, end, margin)
+                        for (lo, hi) in zip(numpy.concatenate(([0], bounds)), numpy.concatenate((bounds, [len(group)])))
+                        if hi > lo]
+
+    def poly(self, p):
+        """The coefficients of the p-th polynomial."""
+        return tuple(self.coeffs[self.start[p]:self.start[p+1]].tolist())
+
+    def window(self, xmin, xmax, ymin, ymax):
+        """Return the roots whose stars reach into the given window."""
+        found = []
+        for (first, end, margin) in self.classes:
+            lo = first + numpy.searchsorted(self.real[first:end], xmin - margin, side='left')
+            hi = first + numpy.searchsorted(self.real[first:end], xmax + margin, side='right')
+            real = self.real[lo:hi]
+            imag = self.imag[lo:hi]
+            size = self.size[lo:hi]
+            visible = (real + size >= xmin) & (real - size <= xmax) & (imag + size >= ymin) & (imag - size <= ymax)
+            found.extend((float(self.real[k]), float(self.imag[k]), self.poly(self.owner[k]))
+                         for k in lo + numpy.flatnonzero(visible))
+        return found
+
+## Tile rendering, performed by the worker processes
+
+store = None # the root store of a worker process
+style = None # radius, decay and colors used to draw the stars
+
+def init_worker(roots, drawing):
+    """Install the roots and drawing parameters in a worker process. Forked workers
+       share the memory of the roots with the parent process."""
+    global store, style
+    store = roots
+    style = drawing
+
+def render_tile(xmin, xmax, ymin, ymax):
+    """Render the given window of the plane as a PNG tile and return its bytes."""
+    (radius, decay, colors) = style
+    nums = AlgebraicNumbers(xmin=xmin, xmax=xmax, ymin=ymin, ymax=ymax,
+                            xres=TILE, yres=TILE, radius=radius, decay=decay, colors=colors)
+    # All tiles use the same colors, regardless of which degrees they show
+    nums.degree_min = store.degree_min
+    nums.degree_max = store.degree_max
+    for (real, imag, poly) in store.window(xmin, xmax, ymin, ymax):
+        nums.register(real, imag, poly)
+    image = nums.paint(nums.stars.values(), TILE, TILE, verbose=False)
+    buf = io.BytesIO()
+    image.write_to_png(buf)
+    return buf.getvalue()
+
+## Tile cache
+
+class TileCache():
+    """A bounded least-recently-used cache of rendered tiles. Tiles are kept in memory,
+       and also on disk if a directory is given, so that they survive a restart."""
+
+    def __init__(self, size=1024, directory=None, disk_size=100000):
+        self.size = size
+        self.directory = directory
+        self.disk_size = disk_size
+        self.lock = threading.Lock()
+        self.memory = OrderedDict() # key -> PNG data
+        self.disk = OrderedDict() # key -> file name, least recently used first
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            files = [f for f in os.listdir(directory) if f.endswith('.png')]
+            files.sort(key=(lambda f: os.path.getmtime(os.path.join(directory, f))))
+            for f in files:
+                self.disk[tuple(map(int, f[:-4].split('-')))] = os.path.join(directory, f)
+
+    def get(self, key):
+        """Return the cached tile, or None if it is not cached."""
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                return self.memory[key]
+            filename = self.disk.get(key)
+            if filename is None:
+                return None
+            self.disk.move_to_end(key)
+        try:
+            with open(filename, 'rb') as fh:
+                data = fh.read()
+            os.utime(filename)
+        except OSError:
+            return None
+        self.put_memory(key, data)
+        return data
+
+    def put(self, key, data):
+        """Store a rendered tile."""
+        self.put_memory(key, data)
+        if not self.directory:
+            return
+        filename = os.path.join(self.directory, '{0}-{1}-{2}.png'.format(*key))
+        (fd, tmp) = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(data)
+        os.replace(tmp, filename)
+        with self.lock:
+            self.disk[key] = filename
+            self.disk.move_to_end(key)
+            evicted = []
+            while len(self.disk) > self.disk_size:
+                evicted.append(self.disk.popitem(last=False)[1])
+        for f in evicted:
+            try:
+                os.unlink(f)
+            except OSError:
+                pass
+
+    def put_memory(self, key, data):
+        with self.lock:
+            self.memory[key] = data
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.size:
+                self.memory.popitem(last=False)
+
+## Tile server
+
+class TileServer():
+    """Render tiles on demand in a pool of worker processes. At zoom level z the square
+       with the lower-left corner (xmin, ymin) and side max(xmax-xmin, ymax-ymin) is
+       divided into 2^z times 2^z tiles."""
+
+    def __init__(self, files, xmin=-2.0, xmax=2.0, ymin=-2.0, ymax=2.0,
+                 radius=0.5, decay=2.5, colors=((1,1,0),(1,0.5,0),(1,0,0.5),(0,0,1)),
+                 max_zoom=20, workers=None, cache=None):
+        self.xmin = xmin
+        self.ymin = ymin
+        self.side = max(xmax - xmin, ymax - ymin)
+        self.max_zoom = max_zoom
+        self.cache = cache or TileCache()
+        self.lock = threading.Lock()
+        self.pending = {} # tiles that are being rendered
+        print ("Loading roots... ", end='', flush=True)
+        roots = RootStore(files, radius, decay)
+        print ("{0} roots.".format(len(roots.real)))
+        context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+        self.executor = ProcessPoolExecutor(max_workers=workers or max(1, os.cpu_count() - 1),
+                                            mp_context=context,
+                                            initializer=init_worker,
+                                            initargs=(roots, (radius, decay, colors)))
+        # Start the workers now, before the server starts any threads
+        self.executor.submit(int).result()
+
+    def valid(self, z, x, y):
+        return 0 <= z <= self.max_zoom and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+    def bounds(self, z, x, y):
+        """The window of the plane shown by a tile."""
+        s = self.side / 2 ** z
+        return (self.xmin + x * s, self.xmin + (x + 1) * s, self.ymin + y * s, self.ymin + (y + 1) * s)
+
+    def tile(self, z, x, y):
+        """Return the PNG data of a tile, rendering it if it is not cached."""
+        key = (z, x, y)
+        data = self.cache.get(key)
+        if data is not None:
+            return data
+        with self.lock:
+            # Several clients asking for the same tile share a single rendering
+            future = self.pending.get(key)
+            if future is None:
+                future = self.executor.submit(render_tile, *self.bounds(z, x, y))
+                self.pending[key] = future
+        try:
+            data = future.result()
+        finally:
+            with self.lock:
+                self.pending.pop(key, None)
+        self.cache.put(key, data)
+        return data
+
+    def serve(self, port):
+        """Serve the tiles and a simple viewer on the given port until interrupted."""
+        tiles = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/':
+                    self.reply(200, 'text/html', PAGE.format(max_zoom=tiles.max_zoom, tile=TILE).encode())
+                    return
+                try:
+                    (z, x, y) = map(int, self.path.strip('/').removesuffix('.png').split('/'))
+                except ValueError:
+                    self.send_error(404)
+                    return
+                if not tiles.valid(z, x, y):
+                    self.send_error(404)
+                    return
+                try:
+                    self.reply(200, 'image/png', tiles.tile(z, x, y))
+                except Exception as e:
+                    self.send_error(500, "Error rendering tile: {0}".format(e))
+
+            def reply(self, code, content_type, data):
+                self.send_response(code)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(('localhost', port), Handler)
+        print ("Serving tiles at http://localhost:{0}/".format(port))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.executor.shutdown(cancel_futures=True)
+
+def cache_directory(root, files, args):
+    """A subdirectory of root specific to the given root files and drawing parameters,
+       so that tiles drawn with different parameters are not mixed up."""
+    h = hashlib.sha1()
+    for name in files:
+        h.update(repr((os.path.abspath(name), os.path.getsize(name), os.path.getmtime(name))).encode())
+    h.update(repr((args.xmin, args.xmax, args.ymin, args.ymax, args.radius, args.decay, args.colors)).encode())
+    return os.path.join(root, h.hexdigest()[:16])
+
+# Main program
+if __name__ == '__main__':
+    ## Process command line
+    parser = argparse.ArgumentParser(description = "Serve zoomable tiles of precomputed complex zeroes")
+    parser.add_argument('--load', dest='load', action='append', required=True, help='file to load precomputed zeroes')
+    parser.add_argument('--port', dest='port', default=8000, type=int, help='HTTP port')
+    parser.add_argument('--radius', dest='radius', default=0.5, type=float, help='maximum root radius')
+    parser.add_argument('--decay', dest='decay', default=2.5, type=float, help='radius decay factor')
+    parser.add_argument('--xmin', dest='xmin', default=-2.0, type=float, help='minimum real component')
+    parser.add_argument('--xmax', dest='xmax', default= 2.0, type=float, help='maximum real component')
+    parser.add_argument('--ymin', dest='ymin', default=-2.0, type=float, help='minimum imaginary component')
+    parser.add_argument('--ymax', dest='ymax', default= 2.0, type=float, help='maximum imaginary component')
+    parser.add_argument('--colors', dest='colors', default=((1,1,0),(1,0.5,0),(1,0,0.5),(0,0,1)), type=color_list, help='list of colors')
+    parser.add_argument('--max-zoom', dest='max_zoom', default=20, type=int, help='deepest zoom level')
+    parser.add_argument('--workers', dest='workers', default=None, type=int, help='number of rendering processes')
+    parser.add_argument('--cache', dest='cache', default=None, help='directory for caching tiles on disk')
+    parser.add_argument('--cache-size', dest='cache_size', default=1024, type=int, help='number of tiles cached in memory')
+    parser.add_argument('--disk-cache-size', dest='disk_cache_size', default=100000, type=int, help='number of tiles cached on disk')
+    args = parser.parse_args()
+    directory = cache_directory(args.cache, args.load, args) if args.cache else None
+    tiles = TileServer(args.load, xmin=args.xmin, xmax=args.xmax, ymin=args.ymin, ymax=args.ymax,
+                       radius=args.radius, decay=args.decay, colors=args.colors,
+                       max_zoom=args.max_zoom, workers=args.workers,
+                       cache=TileCache(args.cache_size, directory, args.disk_cache_size))
+    tiles.serve(args.port)
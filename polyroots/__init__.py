@@ -0,0 +1,40 @@
+"""Compute and draw zeros of polynomials.
+
+The submodules are imported only when one of their names is first used, so
+that importing the package is cheap: numpy is loaded only when roots are
+solved, and cairo or PIL only when something is drawn."""
+
+import importlib
+
+_exports = {
+    'degree_list': 'parse',
+    'float_list': 'parse',
+    'color_list': 'parse',
+    'compute_colors': 'colors',
+    'weight': 'polys',
+    'importance': 'polys',
+    'star_radius': 'polys',
+    'int_list': 'polys',
+    'bounded_polys': 'polys',
+    'coeff_polys': 'polys',
+    'chunks': 'polys',
+    'horner': 'solve',
+    'batch_roots': 'solve',
+    'roots_of': 'solve',
+    'AlgebraicNumbers': 'algebraic',
+    'Zeroes': 'zeroes',
+    'Sweep': 'animate',
+    'ToneMapper': 'tonemap',
+}
+
+__all__ = sorted(_exports)
+
+def __getattr__(name):
+    if name in _exports:
+        value = getattr(importlib.import_module('.' + _exports[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
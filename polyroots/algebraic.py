@@ -0,0 +1,253 @@
+# Registration and drawing of algebraic numbers
+
+import itertools
+import queue
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import os
+import tempfile
+import threading
+import time
+import math
+import pickle
+
+from .colors import compute_colors
+from .polys import importance, star_radius, bounded_polys, chunks
+
+class AlgebraicNumbers():
+    """Representation of all the data needed to calculate the scene."""
+
+    def __init__(self,
+                 xmin = -1.5, xmax = 1.5, ymin = -1.5, ymax = 1.5, # rectangle in the complex plane
+                 xres = 512, yres=None, # image resolution (yres is automatically calculated if ommitted)
+                 radius = 1.0, # radius of largest circle
+                 decay = 0.5, # exponent by which the radius decreeses
+                 save = False, # should we save the roots?
+                 prune = None, # should we skip the roots which are not visible in the picture? (by default only if not saving)
+                 colors = ((1,0,0), (0,1,0), (0,0,1)), # list of colors to use to draw zeroes
+                 preview = None, # file to which previews are written during computation
+                 preview_size = 512, # horizontal resolution of previews
+                 preview_interval = 60.0 # seconds between previews
+    ):
+        # Store parameters
+        self.xmin = xmin
+        self.xmax = xmax
+        self.ymin = ymin
+        self.ymax = ymax
+        self.radius = radius
+        self.decay = decay
+        self.colors = colors
+        self.save = save
+        self.prune = (not save) if prune is None else prune
+        self.preview = preview
+        self.preview_size = preview_size
+        self.preview_interval = preview_interval
+        # Precalculate stuff
+        self.dx = xmax - xmin
+        self.dy = ymax - ymin
+        self.xres = xres
+        self.yres = yres or int(xres * self.dy / self.dx)
+        self.degree_min = 1000000000000
+        self.degree_max = -1
+        self.roots = [] # all roots
+        self.stars = {} # the roots that we are going to draw
+        self.preview_thread = None # thread currently rendering a preview
+        self.preview_time = time.monotonic() # when the last preview was started
+        if preview:
+            # The permissions of new preview files; reading the umask requires setting it
+            self.umask = os.umask(0)
+            os.umask(self.umask)
+
+    def star(self, ctx, x, y, size, c, gradient):
+        r, g, b = c
+        shine = gradient(x,y,0, x,y,size)
+        shine.add_color_stop_rgba(0.0,  1,1,1, 1.0)
+        shine.add_color_stop_rgba(0.05, r,g,b, 1.0)
+        shine.add_color_stop_rgba(0.25, r,g,b, 1.0)
+        shine.add_color_stop_rgba(1.0,  r,g,b, 0.0)
+        ctx.arc(x,y,size,0,2*math.pi)
+        ctx.set_source(shine)
+        ctx.fill()
+
+
+    def register(self, real, imag, poly):
+        """Register a root."""
+        # The colors depend on the range of degrees, which must not change when pruning
+        degree = len(poly) - 1
+        self.degree_min = min(self.degree_min, degree)
+        self.degree_max = max(self.degree_max, degree)
+        if self.prune and not self.visible(real, imag, poly): return
+        if self.save: self.roots.append((real, imag, tuple(poly)))
+        i = round ((real - self.xmin) / self.dx * self.xres)
+        j = round ((imag - self.xmax) / self.dy * self.yres)
+        if ((i,j) not in self.stars) or importance(poly) < importance(self.stars[(i,j)][2]):
+            self.stars[(i,j)] = (real, imag, tuple(poly))
+
+    def visible(self, real, imag, poly):
+        """Does the star of the given root reach into the picture?"""
+        r = star_radius(poly, self.radius, self.decay)
+        return (self.xmin - r <= real <= self.xmax + r) and (self.ymin - r <= imag <= self.ymax + r)
+
+    def compute(self, degrees, max_coeff, duration=0.5, workers=None):
+        """Compute the algebraic numbers of the given degrees (a list or a single degree) and
+           bound on sum of absolute values of coefficients. All degrees are computed by one
+           pool of worker processes. The polynomials are split into chunks which take about
+           duration seconds to solve, and the most expensive chunks are solved first, so that
+           all workers stay busy until the end. If self.prune is set, the polynomials which
+           provably have no roots visible in the picture are skipped, for those degrees at
+           which testing this is faster than solving them."""
+        from .solve import roots_of
+        if isinstance(degrees, int):
+            degrees = [degrees]
+        # Roots need only be accurate to a fraction of a pixel, unless they are saved for
+        # drawing at other resolutions
+        tol = 0.25 * min(self.dx / self.xres, self.dy / self.yres)
+        plain = {'tol': min(tol, 1e-6) if self.save else tol}
+        pruned = dict(plain, window=(self.xmin, self.xmax, self.ymin, self.ymax), radius=self.radius, decay=self.decay)
+
+        tasks = [] # quadruples (estimated cost, degree, polynomials, options for roots_of)
+        for degree in degrees:
+            polys = bounded_polys(degree, max_coeff)
+            sample = list(itertools.islice(polys, 1000))
+            if not sample:
+                continue
+            # Pruned polynomials never reach register, but their degree still counts for the colors
+            self.degree_min = min(self.degree_min, degree)
+            self.degree_max = max(self.degree_max, degree)
+            (cost, options) = (self.calibrate(sample, plain), plain)
+            if self.prune:
+                # The exclusion test only pays off when much of the plane is outside the picture
+                (cost, options) = min((cost, options), (self.calibrate(sample, pruned), pruned), key=(lambda co: co[0]))
+            chunk = max(100, min(100000, int(duration / cost)))
+            n = len(tasks)
+            for t in chunks(itertools.chain(sample, polys), chunk):
+                tasks.append((cost * len(t), degree, t, options))
+            print("Generated {0} tasks (degree {1}, coefficient {2}, chunk {3}{4})".format(
+                len(tasks) - n, degree, max_coeff, chunk, ", pruned" if options is pruned else ""))
+        tasks.sort(key=(lambda t: t[0]), reverse=True)
+
+        results = queue.Queue()
+        num_workers = workers or max(1, os.cpu_count() - 1)
+
+        j = 0
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            futures = {executor.submit(roots_of, t, **options) for (_cost, _degree, t, options) in tasks}
+            del tasks
+
+            for future in as_completed(futures):
+                # Forget the future, so that its result is freed once it is registered
+                futures.remove(future)
+                try:
+                    results.put(future.result())
+                    print(".", end='', flush=True)
+                except Exception as e:
+                    print(f"Error computing roots: {e}")
+                # Register the roots as they come in, so that memory stays bounded and previews show them
+                j += self.register_results(results)
+                if self.preview:
+                    self.start_preview()
+
+        if self.preview_thread:
+            self.preview_thread.join()
+
+        print("\nDegrees {0} completed with {1} roots".format(','.join(map(str, degrees)), j))
+
+    def calibrate(self, sample, options):
+        """Estimate the time it takes to solve one polynomial similar to those in the sample."""
+        from .solve import roots_of
+        roots_of(sample[:10], **options) # warm up
+        start = time.perf_counter()
+        roots_of(sample, **options)
+        return max(1e-9, (time.perf_counter() - start) / len(sample))
+
+    def register_results(self, results):
+        """Register the roots in the results queue and return their number."""
+        j = 0
+        while not results.empty():
+            result = results.get()
+            print('.', end='', flush=True)
+            for (roots, poly) in result:
+                for root in roots:
+                    j += 1
+                    self.register(root.real, root.imag, poly)
+        return j
+
+    def start_preview(self):
+        """Render a preview of the roots registered so far in a background thread,
+           unless a preview was made recently or is still being rendered."""
+        if time.monotonic() - self.preview_time < self.preview_interval:
+            return
+        if self.preview_thread and self.preview_thread.is_alive():
+            return
+        self.preview_time = time.monotonic()
+        stars = list(self.stars.values())
+        self.preview_thread = threading.Thread(target=self.save_preview, args=(stars,), daemon=True)
+        self.preview_thread.start()
+
+    def save_preview(self, stars):
+        """Draw the given stars at preview resolution and atomically replace the preview file,
+           whose permissions are given by the umask as for any other newly created file."""
+        xres = self.preview_size
+        yres = max(1, int(xres * self.dy / self.dx))
+        image = self.paint(stars, xres, yres, verbose=False)
+        (fd, tmp) = tempfile.mkstemp(suffix='.png', dir=os.path.dirname(os.path.abspath(self.preview)))
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                image.write_to_png(fh)
+            os.chmod(tmp, 0o666 & ~self.umask) # mkstemp creates the file readable only by us
+            os.replace(tmp, self.preview)
+        except Exception as e:
+            os.unlink(tmp)
+            print(f"Error writing preview: {e}")
+
+    def draw(self):
+        """Draw all roots of polynomials whose sum of absolute values does not exceed
+           self.coeff and whose degree does not exceed self.degree.."""
+        self.image = self.paint(self.stars.values(), self.xres, self.yres)
+
+    def paint(self, stars, xres, yres, verbose=True):
+        """Paint the given stars onto a new image of the given resolution and return it."""
+        import cairo
+        i = 0
+        m = len(stars)
+        degree_min = self.degree_min
+        colors = compute_colors(self.degree_max - degree_min + 1, self.colors)
+        if verbose: print ("Using colors: {0}".format(colors))
+        # Create image and canvas
+        image = cairo.ImageSurface(cairo.FORMAT_ARGB32, xres, yres)
+        ctx = cairo.Context(image)
+        ctx.scale(xres / self.dx, yres / self.dy)
+        ctx.translate(-self.xmin, -self.ymin)
+        # Paint a black background
+        ctx.set_source_rgb(0,0,0)
+        ctx.rectangle(self.xmin, self.ymin, self.dx, self.dy)
+        ctx.fill()
+        for (x, y, poly) in sorted(stars, reverse=True, key=(lambda r: len(r[2]))):
+            d = len(poly) - 1
+            col = colors[d-degree_min] # color
+            r = star_radius(poly, self.radius, self.decay) # radius
+            self.star(ctx, x, y, r, col, cairo.RadialGradient)
+            i += 1
+            if verbose and i % 1000 == 0:
+                print ("Drawing roots: {0}%   ".format(round(100 * i / m)), end='\r')
+        return image
+
+    def save_numbers(self, fh):
+        """Save the computed roots to a file."""
+        if not self.save:
+            print ("Nothing to save.")
+        else:
+            print ("Saving {0} roots to {1}".format(len(self.roots), fh.name))
+            pickle.dump(self.roots, fh)
+
+    def load_numbers(self, fh):
+        """Load precomputed roots from a file"""
+        print ("Loading roots from {0}... ".format(fh.name), end='', flush=True)
+        roots = pickle.load(fh)
+        print ("{0} roots... ".format(len(roots)), end='', flush=True)
+        for (real, imag, poly) in roots:
+            self.register(real, imag, poly)
+        print ("registered.")
+
+    def save_image(self, outfile):
+        """Save image to the given output file in PNG format."""
+        self.image.write_to_png(outfile)
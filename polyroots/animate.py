@@ -0,0 +1,98 @@
+# Animations in which the coefficients move along a path
+
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from .zeroes import Zeroes
+
+def render_frame(coeffs, options):
+    """Draw the zeroes for the given coefficients and return the raw RGB data of the image."""
+    nicle = Zeroes(coeffs=coeffs, **options)
+    for d in nicle.degrees:
+        nicle.draw_roots1(d)
+    return nicle.image.tobytes()
+
+class Sweep():
+    """An animation whose frames are drawn by Zeroes, with the coefficients of the
+       i-th frame taken from the i-th element of path. The remaining keyword arguments
+       are passed on to Zeroes."""
+
+    def __init__(self, path, rate=30, workers=None, segment=60, bitrate='10000k', **options):
+        self.path = [tuple(c) for c in path]
+        self.rate = rate # animation rate (FPS)
+        self.workers = workers or max(1, os.cpu_count() - 1)
+        self.segment = segment # number of frames encoded into one segment
+        self.bitrate = bitrate
+        self.options = options
+        nicle = Zeroes(coeffs=self.path[0], **options)
+        self.xres = nicle.xres
+        self.yres = nicle.yres
+
+    def segment_name(self, parts, k, ext):
+        return os.path.join(parts, "seg{0:05d}{1}".format(k, ext))
+
+    def encoder(self, filename):
+        """Start an ffmpeg process which encodes raw RGB frames from its standard input."""
+        return subprocess.Popen(['ffmpeg', '-loglevel', 'error', '-y',
+                                 '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+                                 '-s', '{0}x{1}'.format(self.xres, self.yres),
+                                 '-r', str(self.rate),
+                                 '-i', '-',
+                                 '-r', str(self.rate),
+                                 '-b:v', self.bitrate,
+                                 filename],
+                                stdin=subprocess.PIPE)
+
+    def render(self, out):
+        """Render the animation into the movie file out. The frames are drawn in parallel
+           and streamed in order to ffmpeg in segments, which are kept in the folder
+           out.parts until the whole movie is finished. If the rendering is interrupted,
+           running it again resumes after the last finished segment."""
+        ext = os.path.splitext(out)[1]
+        parts = out + '.parts'
+        os.makedirs(parts, exist_ok=True)
+        segments = range((len(self.path) + self.segment - 1) // self.segment)
+        todo = [k for k in segments if not os.path.exists(self.segment_name(parts, k, ext))]
+        frames = [i for k in todo for i in range(k * self.segment, min(len(self.path), (k + 1) * self.segment))]
+        print ("Rendering {0} of {1} frames with {2} workers".format(len(frames), len(self.path), self.workers))
+
+        done = {} # rendered frames waiting for their turn
+        encoder = None
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            pending = {}
+            upcoming = iter(frames)
+            for i in frames:
+                # Keep a bounded number of frames in flight, so that memory stays bounded
+                while len(pending) < 2 * self.workers:
+                    j = next(upcoming, None)
+                    if j is None: break
+                    pending[executor.submit(render_frame, self.path[j], self.options)] = j
+                while i not in done:
+                    (finished, _) = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        done[pending.pop(future)] = future.result()
+                (k, r) = divmod(i, self.segment)
+                if r == 0:
+                    encoder = self.encoder(self.segment_name(parts, k, '.tmp' + ext))
+                encoder.stdin.write(done.pop(i))
+                if r == self.segment - 1 or i == len(self.path) - 1:
+                    encoder.stdin.close()
+                    if encoder.wait() != 0:
+                        raise RuntimeError("ffmpeg failed to encode segment {0}".format(k))
+                    os.replace(self.segment_name(parts, k, '.tmp' + ext), self.segment_name(parts, k, ext))
+                    print ("Finished frame {0} of {1}".format(i + 1, len(self.path)))
+
+        # Join the segments into the movie
+        listing = os.path.join(parts, 'segments.txt')
+        with open(listing, 'w') as fh:
+            for k in segments:
+                fh.write("file '{0}'\n".format(os.path.basename(self.segment_name(parts, k, ext))))
+        concat = subprocess.run(['ffmpeg', '-loglevel', 'error', '-y',
+                                 '-f', 'concat', '-safe', '0', '-i', listing,
+                                 '-c', 'copy', out])
+        if concat.returncode != 0:
+            raise RuntimeError("ffmpeg failed to join the segments of {0}".format(out))
+        shutil.rmtree(parts)
+        print ("FINISHED")
@@ -0,0 +1,27 @@
+# Color function helper
+
+import math
+
+def compute_colors(n, cols, top=1.0):
+    """Interpolate a list of colors cols to a list of n colors.
+       The components are clamped between 0 and top, and rounded
+       to integers if top is an integer."""
+    if n == 1:
+        return (cols[0],)
+    m = len(cols)
+    if isinstance(top, int):
+        clamp = lambda v: min(top, max(0, int(0.5 + v)))
+    else:
+        clamp = lambda v: min(top, max(0.0, v))
+    lst = []
+    for i in range(n):
+        j = math.floor (i * (m - 1.0) / (n - 1.0))
+        k = math.ceil (i * (m - 1.0) / (n - 1.0))
+        t = (i * (m - 1.0) / (n - 1.0)) - j
+        (r0, g0, b0) = cols[int(j)]
+        (r1, g1, b1) = cols[int(k)]
+        r = clamp((1.0 - t) * r0 + t * r1)
+        g = clamp((1.0 - t) * g0 + t * g1)
+        b = clamp((1.0 - t) * b0 + t * b1)
+        lst.append((r,g,b))
+    return tuple(lst)
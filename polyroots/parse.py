@@ -0,0 +1,26 @@
+# Parsing of command-line arguments
+
+def degree_list(s):
+    """Convert degrees given on command line to a list.
+       For example, the string '1,2-5,7' is converted to [1,2,3,4,5,7]."""
+    l = []
+    for r in s.split(','):
+        t = r.split('-')
+        if len(t) == 1:
+            l.append(int(t[0]))
+        else:
+            a = int(t[0])
+            b = int(t[1])
+            l.extend(range(a, b + (1 if a <= b else -1), (1 if a <= b else -1)))
+    return l
+
+def float_list(s):
+    """Convert a string of comma separated floats to a list of floats."""
+    return sorted(map(float, s.split(',')))
+
+def color_list(s, component=float):
+    """Convert a colon-separated list of RGB triples to a list of triples.
+       Example: the string '255,127,0:127,127,127:0,0,255' is converted
+       to [(255,127,0), (127,127,127), (0,0,255)]. The components are
+       converted with the given function."""
+    return (tuple(tuple(map(component,rgb.split(','))) for rgb in s.split(':')))
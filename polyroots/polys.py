@@ -0,0 +1,57 @@
+# Enumeration of polynomials
+
+import itertools
+
+def weight(poly):
+    return sum(map(abs,poly))
+
+def importance(poly):
+    return (weight(poly), len(poly))
+
+def star_radius(poly, radius, decay):
+    """The radius of the star which represents a root of the polynomial in a picture."""
+    # return max(0.0001, radius * (decay ** weight(poly)))
+    return max(0.0001, radius / weight(poly) ** decay)
+
+def int_list(bound):
+    """List of floats from -bound to bound, to be used as coefficients."""
+    return list(range(-bound, bound+1))
+
+def bounded_polys(degree, max_coeff):
+    """Generate the polynomials of the given degree whose sum of absolute values of
+       coefficients does not exceed max_coeff. Each polynomial is a list of coefficients,
+       leading coefficient first. The leading coefficient is positive, and the constant
+       term of a non-linear polynomial is non-zero, so that every root is generated by
+       essentially one polynomial."""
+    poly = [0 for _i in range(degree+1)] # current poly
+
+    def generate(k, coeff):
+        if k <= degree:
+            cmax = coeff
+            cmin = (-cmax if k != 0 else 1)
+            for c in range(cmin, cmax+1):
+                if k == degree and degree > 1 and c == 0:
+                    # constant term must be non-zero for non-linear polynomials
+                    continue
+                if k == degree and degree == 1 and c == 0 and poly[0] != 1:
+                    # linear polynomial with zero constant term must have leading coefficient 1
+                    continue
+                poly[k] = c
+                yield from generate(k+1, coeff - abs(c))
+        else:
+            yield poly[:]
+
+    return generate(0, max_coeff)
+
+def coeff_polys(length, coeffs):
+    """Generate all polynomials with the given number of coefficients, taken from coeffs."""
+    return (list(p) for p in itertools.product(coeffs, repeat=length))
+
+def chunks(iterable, size):
+    """Split an iterable into lists of at most the given size."""
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,185 @@
+# Root solving
+
+import math
+
+import numpy
+
+
+def horner(coeffs, z):
+    """Evaluate polynomials and their derivatives at points z using Horner's scheme.
+       The rows of coeffs are polynomials with leading coefficient first, and the
+       corresponding rows of z are the points at which they are evaluated."""
+    p = numpy.zeros_like(z)
+    dp = numpy.zeros_like(z)
+    for c in coeffs.T:
+        dp = dp * z + p
+        p = p * z + c[:, None]
+    return p, dp
+
+def quadratic(b, c):
+    """Roots of z^2 + b z + c, computed without cancellation."""
+    s = numpy.sqrt(b * b - 4 * c)
+    s = numpy.where((b.conj() * s).real < 0, -s, s)
+    q = -0.5 * (b + s)
+    return numpy.stack((q, numpy.where(q == 0, 0, c / q)), axis=1)
+
+def cubic(a, b, c):
+    """Roots of z^3 + a z^2 + b z + c by Cardano's formula."""
+    p = b - a * a / 3
+    q = 2 * a ** 3 / 27 - a * b / 3 + c
+    s = numpy.sqrt(q * q / 4 + p ** 3 / 27)
+    s = numpy.where((q.conj() * s).real < 0, -s, s)
+    u = (-q / 2 - s) ** (1 / 3)
+    omega = numpy.exp(2j * numpy.pi / 3) ** numpy.arange(3)
+    u = u[:, None] * omega
+    t = numpy.where(u == 0, 0, u - p[:, None] / (3 * u))
+    return t - a[:, None] / 3
+
+def quartic(a, b, c, d):
+    """Roots of z^4 + a z^3 + b z^2 + c z + d by Ferrari's method."""
+    p = b - 3 * a * a / 8
+    q = c - a * b / 2 + a ** 3 / 8
+    r = d - a * c / 4 + a * a * b / 16 - 3 * a ** 4 / 256
+    # The root of the resolvent cubic with the largest modulus, which is zero only for repeated roots
+    ms = cubic(p, p * p / 4 - r, -q * q / 8)
+    m = ms[numpy.arange(len(ms)), numpy.abs(ms).argmax(axis=1)]
+    s = numpy.sqrt(2 * m)
+    e = 2 * q / s
+    y = numpy.stack((s + numpy.sqrt(-(2 * p + 2 * m + e)),
+                     s - numpy.sqrt(-(2 * p + 2 * m + e)),
+                     -s + numpy.sqrt(-(2 * p + 2 * m - e)),
+                     -s - numpy.sqrt(-(2 * p + 2 * m - e))), axis=1) / 2
+    return y - a[:, None] / 4
+
+def closed_form(monic):
+    """Roots of monic polynomials of degree 1 to 4, given as the rows of monic
+       with the leading coefficient 1 left out, computed by the classical formulas."""
+    a = monic.T.astype(complex)
+    if len(a) == 1:
+        return -a[0][:, None]
+    elif len(a) == 2:
+        return quadratic(*a)
+    elif len(a) == 3:
+        return cubic(*a)
+    else:
+        return quartic(*a)
+
+def batch_roots(coeffs, tol):
+    """Compute roots of polynomials of equal length, given as the rows of coeffs.
+       Polynomials of degree at most 4 are first solved at once by the classical
+       formulas, and the companion matrices of the others in single precision.
+       The roots are then polished with Newton's method in double precision. Polynomials whose
+       roots do not settle to within tol, on which Newton's method converges only linearly
+       (as it does near multiple roots), whose roots are so badly conditioned that tiny
+       changes of the coefficients would move them by more than tol, or which have roots
+       closer than tol to each other, are solved again with numpy.roots in double precision."""
+    n, m = coeffs.shape
+    d = m - 1
+    if d < 1 or n == 0:
+        return [numpy.zeros(0, dtype=complex) for _i in range(n)]
+    lead = coeffs[:, 0]
+    bad = (lead == 0)
+    lead = numpy.where(bad, 1.0, lead)
+    with numpy.errstate(all='ignore'):
+        if d <= 4:
+            roots = closed_form(coeffs[:, 1:] / lead[:, None])
+        else:
+            companion = numpy.zeros((n, d, d), dtype=numpy.float32)
+            companion[:, 0, :] = -coeffs[:, 1:] / lead[:, None]
+            companion[:, numpy.arange(1, d), numpy.arange(d-1)] = 1.0
+            roots = numpy.linalg.eigvals(companion).astype(complex)
+        steps = []
+        for _i in range(2):
+            p, dp = horner(coeffs, roots)
+            step = p / dp
+            steps.append(numpy.abs(step))
+            # Near multiple roots Newton's method may make things worse
+            polished = roots - step
+            better = numpy.abs(horner(coeffs, polished)[0]) <= numpy.abs(p)
+            roots = numpy.where(numpy.isfinite(step) & better, polished, roots)
+        bad |= ~(steps[-1] <= tol).all(axis=1)
+        # Quadratic convergence shrinks the step far more than linear convergence, which halves it
+        bad |= ((steps[-1] > 0.25 * steps[0]) & (steps[-1] > 1e-9 * (1.0 + numpy.abs(roots)))).any(axis=1)
+        # Relative changes of the coefficients by sqrt(eps) should move the roots by less than tol
+        size = horner(numpy.abs(coeffs), numpy.abs(roots))[0].real
+        bad |= (1.5e-8 * size > tol * numpy.abs(dp)).any(axis=1)
+        if d > 1:
+            dist = numpy.abs(roots[:, :, None] - roots[:, None, :])
+            dist[:, numpy.arange(d), numpy.arange(d)] = numpy.inf
+            bad |= (dist.min(axis=(1, 2)) < tol)
+    result = list(roots)
+    for i in numpy.flatnonzero(bad):
+        result[i] = numpy.roots(coeffs[i])
+    return result
+
+def taylor(coeffs, c):
+    """Compute the coefficients of the polynomials expanded around the point c, that is
+       the list of arrays [p(c), p'(c), p''(c)/2, ...], by repeated synthetic division."""
+    a = coeffs.T.astype(complex) # one row per coefficient, so that the rows are contiguous
+    m = a.shape[0]
+    b = []
+    for k in range(m):
+        for i in range(1, m - k):
+            a[i] += c * a[i-1]
+        b.append(a[m-k-1].copy())
+    return b
+
+def excluded(coeffs, window, margin):
+    """Determine which polynomials provably have no roots within distance margin of
+       the window (xmin, xmax, ymin, ymax). A polynomial is excluded if its roots lie
+       outside an annulus around the origin which misses the window, as bounded by
+       Cauchy's bounds, or if a disk of radius r around a point c is free of roots by
+       |p(c)| > sum_k |p^(k)(c)/k!| r^k for each of the disks covering the window."""
+    (xmin, xmax, ymin, ymax) = window
+    (n, m) = coeffs.shape
+    if m < 2:
+        return numpy.ones(n, dtype=bool)
+    # Annulus which contains all the roots
+    a = numpy.abs(coeffs)
+    with numpy.errstate(all='ignore'):
+        upper = 1.0 + a[:, 1:].max(axis=1) / a[:, 0]
+        lower = a[:, -1] / (a[:, -1] + a[:, :-1].max(axis=1))
+    near = numpy.hypot(numpy.maximum(0.0, numpy.maximum(xmin - margin, -(xmax + margin))),
+                       numpy.maximum(0.0, numpy.maximum(ymin - margin, -(ymax + margin))))
+    far = numpy.hypot(numpy.maximum(abs(xmin - margin), abs(xmax + margin)),
+                      numpy.maximum(abs(ymin - margin), abs(ymax + margin)))
+    out = (upper * (1.0 + 1e-9) < near) | (lower * (1.0 - 1e-9) > far)
+    # Disks around squarish pieces of the window
+    (w, h) = (xmax - xmin, ymax - ymin)
+    k = min(16, max(1, math.ceil(max(w, h) / max(min(w, h), 1e-300))))
+    if w >= h:
+        pieces = [(complex(xmin + (i + 0.5) * w / k, (ymin + ymax) / 2), math.hypot(w / k, h) / 2) for i in range(k)]
+    else:
+        pieces = [(complex((xmin + xmax) / 2, ymin + (i + 0.5) * h / k), math.hypot(w, h / k) / 2) for i in range(k)]
+    # Only the polynomials which pass the test for every piece so far are tested further
+    rest = numpy.flatnonzero(~out)
+    for (c, rho) in pieces:
+        b = numpy.abs(taylor(coeffs[rest], c))
+        r = rho + margin[rest]
+        bound = numpy.zeros(len(rest))
+        for bk in b[:0:-1]:
+            bound = (bound + bk) * r
+        rest = rest[b[0] > bound * (1.0 + 1e-6)]
+    out[rest] = True
+    return out
+
+def roots_of(polys, tol=1e-6, window=None, radius=0.0, decay=0.0):
+    """Compute roots of the given polynomials, accurate to within tol.
+       Polynomials are grouped by length and solved in batches.
+       If window = (xmin, xmax, ymin, ymax) is given, the polynomials which provably
+       have no roots whose stars of radius max(0.0001, radius / weight ** decay) reach
+       into the window are not solved, and are left out of the result."""
+    groups = {}
+    for (i, p) in enumerate(polys):
+        groups.setdefault(len(p), []).append(i)
+    roots = []
+    for idx in groups.values():
+        coeffs = numpy.array([polys[i] for i in idx], dtype=float)
+        if window is not None:
+            margin = numpy.maximum(0.0001, radius / numpy.abs(coeffs).sum(axis=1) ** decay)
+            keep = numpy.flatnonzero(~excluded(coeffs, window, margin))
+            idx = [idx[k] for k in keep]
+            coeffs = coeffs[keep]
+        roots.extend(zip(idx, batch_roots(coeffs, tol)))
+    roots.sort(key=(lambda ir: ir[0]))
+    return tuple((r, polys[i]) for (i, r) in roots)
@@ -0,0 +1,194 @@
+# Tone mapping of the grayscale count images made by the C program
+
+import math
+import os
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+
+TIFF_TYPES = {1: 'B', 3: 'H', 4: 'I'} # BYTE, SHORT and LONG fields
+HISTOGRAM = 1 << 16 # counts from here on share the last bin of the histogram
+QUANTUM = 4294967295.0 # largest 32-bit count
+
+class CountImage():
+    """An uncompressed 32-bit grayscale TIFF image, as written by the C program.
+       The file is mapped into memory and read in bands of rows, so that the
+       whole image never needs to fit into memory."""
+
+    def __init__(self, filename):
+        self.raw = numpy.memmap(filename, dtype=numpy.uint8, mode='r')
+        order = {b'II': '<', b'MM': '>'}.get(bytes(self.raw[0:2]))
+        if order is None or self.unpack(order + 'H', 2) != (42,):
+            raise ValueError("{0} is not a TIFF image".format(filename))
+        (ifd,) = self.unpack(order + 'I', 4)
+        (n,) = self.unpack(order + 'H', ifd)
+        tags = {}
+        for k in range(n):
+            e = ifd + 2 + 12 * k
+            (tag, typ, count) = self.unpack(order + 'HHI', e)
+            if typ not in TIFF_TYPES: continue
+            fmt = order + TIFF_TYPES[typ] * count
+            size = struct.calcsize(fmt)
+            tags[tag] = self.unpack(fmt, e + 8 if size <= 4 else self.unpack(order + 'I', e + 8)[0])
+        self.width = tags[256][0]
+        self.height = tags[257][0]
+        if (tags.get(258, (1,))[0] != 32 or tags.get(277, (1,))[0] != 1 or
+            tags.get(259, (1,))[0] != 1 or tags.get(339, (1,))[0] != 1):
+            raise ValueError("{0} is not an uncompressed 32-bit grayscale TIFF image".format(filename))
+        self.rows_per_strip = min(self.height, tags.get(278, (self.height,))[0])
+        self.offsets = tags[273]
+        self.dtype = numpy.dtype(order + 'u4')
+
+    def unpack(self, fmt, offset):
+        return struct.unpack(fmt, bytes(self.raw[offset:offset + struct.calcsize(fmt)]))
+
+    def rows(self, r0, r1):
+        """Return the counts in rows r0 up to r1."""
+        parts = []
+        for k in range(r0 // self.rows_per_strip, (r1 - 1) // self.rows_per_strip + 1):
+            start = k * self.rows_per_strip
+            n = min(self.rows_per_strip, self.height - start)
+            offset = self.offsets[k]
+            strip = self.raw[offset:offset + 4 * n * self.width].view(self.dtype).reshape(n, self.width)
+            parts.append(strip[max(0, r0 - start):min(n, r1 - start)])
+        return parts[0] if len(parts) == 1 else numpy.concatenate(parts)
+
+def histogram(counts):
+    """Histogram of the counts, with the large ones put together in the last bin."""
+    return numpy.bincount(numpy.minimum(counts, HISTOGRAM - 1).ravel(), minlength=HISTOGRAM)
+
+def tail_histogram(counts, edges):
+    """Histogram of the counts which share the last bin of histogram(counts), in the given bins."""
+    return numpy.histogram(counts[counts >= HISTOGRAM - 1], bins=edges)[0]
+
+def png_chunk(tag, data):
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+def adler32_combine(adler1, adler2, length2):
+    """The Adler-32 checksum of the concatenation of two pieces of data, computed from
+       their checksums and the length of the second one."""
+    BASE = 65521
+    rem = length2 % BASE
+    sum1 = adler1 & 0xffff
+    sum2 = (rem * sum1) % BASE
+    sum1 += (adler2 & 0xffff) + BASE - 1
+    sum2 += ((adler1 >> 16) & 0xffff) + ((adler2 >> 16) & 0xffff) + BASE - rem
+    sum1 %= BASE
+    sum2 %= BASE
+    return (sum2 << 16) | sum1
+
+class ToneMapper():
+    """Convert a count image to a colored PNG image in the same way as
+
+           convert in.tiff -evaluate log <log> -contrast-stretch <black>%x<white>% -fill <fill> -tint <tint> out.png
+
+       (-normalize is the same as -contrast-stretch 2%x1%). The image is processed in
+       bands of rows by a pool of threads: the first pass collects a histogram of the
+       counts (and, if black or white lies among the largest counts, another pass collects
+       a finer histogram of those), and the last pass maps the colors and compresses each
+       band separately, so that only a few bands are in memory at any time."""
+
+    def __init__(self, log=400000.0, black=2.0, white=1.0, fill=(255,165,0), tint=100.0, workers=None, band=None):
+        self.log = log
+        self.black = black # percentage of pixels that become black
+        self.white = white # percentage of pixels that become white
+        self.fill = fill
+        self.tint = tint
+        self.workers = workers or os.cpu_count()
+        self.band = band # number of rows processed at once
+
+    def scale(self, counts):
+        """Logarithmic scaling of counts to the range from 0 to 1."""
+        return numpy.log1p(counts.astype(numpy.float32) * numpy.float32(self.log / QUANTUM)) / numpy.float32(math.log1p(self.log))
+
+    def levels(self, hist, maximum, tail=None):
+        """Compute the counts which are mapped to black and to white. A level which falls
+           into the last bin of hist is looked up in tail(), which should return a pair
+           (edges, histogram) of the counts in that bin. Without tail it becomes maximum."""
+        total = hist.sum()
+        cumulative = numpy.cumsum(hist)
+        fine = None
+        def level(rank, side):
+            nonlocal fine
+            k = int(numpy.searchsorted(cumulative, rank, side=side))
+            if k < HISTOGRAM - 1 or maximum <= HISTOGRAM - 1:
+                return min(k, maximum)
+            if tail is None:
+                print ("Warning: level among the counts above {0} approximated by the maximum".format(HISTOGRAM - 1))
+                return maximum
+            fine = fine or tail()
+            (edges, counts) = fine
+            j = int(numpy.searchsorted(numpy.cumsum(counts), rank - cumulative[HISTOGRAM - 2], side=side))
+            return min(maximum, int(math.ceil(edges[min(j, len(counts) - 1)])))
+        black = level(total * self.black / 100.0, 'right')
+        white = level(total * (1.0 - self.white / 100.0), 'left')
+        return (black, max(white, black + 1))
+
+    def colors(self, counts, lo, hi):
+        """Map counts to RGB colors, the values lo and hi being mapped to black and white."""
+        v = numpy.clip((self.scale(counts) - lo) / (hi - lo), 0.0, 1.0)
+        # The tint changes the mid-tones the most, and leaves black and white alone
+        (r, g, b) = (c / 255.0 for c in self.fill)
+        intensity = 0.212656 * r + 0.715158 * g + 0.072186 * b
+        vector = numpy.array([self.tint * c / 100.0 - intensity for c in (r, g, b)], dtype=numpy.float32)
+        w = 1.0 - 4.0 * (v - 0.5) ** 2
+        rgb = numpy.clip(v[..., None] + w[..., None] * vector, 0.0, 1.0)
+        return (rgb * 255.0 + 0.5).astype(numpy.uint8)
+
+    def convert(self, infile, outfile):
+        """Tone map the TIFF image infile and write the result to the PNG file outfile."""
+        image = CountImage(infile)
+        band = self.band or max(1, (1 << 22) // image.width)
+        bands = [(r, min(r + band, image.height)) for r in range(0, image.height, band)]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            print ("Collecting statistics of {0}x{1} image".format(image.width, image.height))
+            hist = numpy.zeros(HISTOGRAM, dtype=numpy.int64)
+            maximum = 0
+            def statistics(rows):
+                counts = image.rows(*rows)
+                return (histogram(counts), int(counts.max()))
+            for (h, m) in executor.map(statistics, bands):
+                hist += h
+                maximum = max(maximum, m)
+            def tail():
+                # The bins grow with the counts, like the differences between their logarithms
+                print ("Collecting statistics of the counts above {0}".format(HISTOGRAM - 1))
+                edges = numpy.geomspace(HISTOGRAM - 1, maximum + 1, HISTOGRAM + 1)
+                return (edges, sum(executor.map(lambda rows: tail_histogram(image.rows(*rows), edges), bands)))
+            (black, white) = self.levels(hist, maximum, tail)
+            print ("Maximum count {0}, black at {1}, white at {2}".format(maximum, black, white))
+            (lo, hi) = self.scale(numpy.array([black, white]))
+
+            def compress(rows):
+                rgb = self.colors(image.rows(*rows), lo, hi)
+                # Every row starts with the filter type 0 (no filter)
+                data = numpy.concatenate((numpy.zeros((rgb.shape[0], 1), dtype=numpy.uint8),
+                                          rgb.reshape(rgb.shape[0], -1)), axis=1).tobytes()
+                deflate = zlib.compressobj(6, zlib.DEFLATED, -15)
+                return (zlib.adler32(data), len(data), deflate.compress(data) + deflate.flush(zlib.Z_SYNC_FLUSH))
+
+            with open(outfile, 'wb') as fh:
+                fh.write(b'\x89PNG\r\n\x1a\n')
+                fh.write(png_chunk(b'IHDR', struct.pack('>IIBBBBB', image.width, image.height, 8, 2, 0, 0, 0)))
+                # The bands are compressed independently and joined into a single zlib stream
+                fh.write(png_chunk(b'IDAT', b'\x78\x9c'))
+                adler = 1
+                def write(future, rows):
+                    nonlocal adler
+                    (checksum, length, compressed) = future.result()
+                    adler = adler32_combine(adler, checksum, length)
+                    fh.write(png_chunk(b'IDAT', compressed))
+                    print ("Tone mapping: {0}%   ".format(round(100 * rows[1] / image.height)), end='\r')
+                pending = []
+                for rows in bands:
+                    pending.append((executor.submit(compress, rows), rows))
+                    if len(pending) >= 2 * self.workers:
+                        write(*pending.pop(0))
+                while pending:
+                    write(*pending.pop(0))
+                fh.write(png_chunk(b'IDAT', zlib.compressobj(6, zlib.DEFLATED, -15).flush() + struct.pack('>I', adler)))
+                fh.write(png_chunk(b'IEND', b''))
+        print ("\nWrote {0}".format(outfile))
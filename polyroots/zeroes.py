@@ -0,0 +1,62 @@
+# Drawing of zeroes of polynomials with coefficients from a given set
+
+from .colors import compute_colors
+from .polys import coeff_polys, chunks
+
+class Zeroes():
+    """Representation of all the data needed to calculate an image."""
+
+    def __init__(self,
+                 coeffs, # list of coefficient values
+                 degrees, # list of degrees
+                 xmin = -1.5, xmax = 1.5, ymin = -1.5, ymax = 1.5, # rectangle in the complex plane
+                 xres = 512, yres=None, # image resolution (yres is automatically calculated if ommitted)
+                 radius = 200.0, # radius of circle representing degree 0
+                 colors = ((255,0,0), (0,255,0), (0,0,255)) # list of colors to use to draw zeroes
+    ):
+        from PIL import Image, ImageDraw
+        # Store parameters
+        self.xmin = xmin
+        self.xmax = xmax
+        self.ymin = ymin
+        self.ymax = ymax
+        self.degrees = degrees
+        self.coeffs = coeffs
+        self.radius = radius
+        # Precalculate stuff
+        self.dx = xmax - xmin
+        self.dy = ymax - ymin
+        self.xres = xres
+        self.yres = yres or int(xres * self.dy / self.dx)
+        self.dmin = min(degrees)
+        self.dmax = max(degrees)
+        self.colors = compute_colors(1 + self.dmax - self.dmin, tuple(colors), 255)
+        # Create image and canvas
+        self.image = Image.new("RGB", (self.xres, self.yres))
+        self.draw = ImageDraw.Draw(self.image)
+
+    def draw_roots1(self, degree, chunk=10000):
+        """Draw the roots of polynomials of the given degree."""
+        import numpy
+        from .solve import batch_roots
+        r = max (0.5, self.radius * (0.55 ** degree)) # radius
+        col = self.colors[degree - self.dmin] # color
+        tol = 0.25 * min(self.dx / self.xres, self.dy / self.yres) # a fraction of a pixel
+        for polys in chunks(coeff_polys(degree, self.coeffs), chunk):
+            for roots in batch_roots(numpy.array(polys, dtype=float).reshape(len(polys), degree), tol):
+                for root in roots:
+                    px = self.xres * (root.real - self.xmin) / self.dx
+                    py = self.yres * (root.imag - self.ymin) / self.dy
+                    self.draw.ellipse(
+                        [int(px-r+0.5), int(py-r+0.5), int(px+r+0.5), int(py+r+0.5)],
+                        fill=col)
+
+    def draw_roots(self):
+        """Draw all roots of polynomials of all the given degrees."""
+        for d in self.degrees:
+            print ("Computing degreee {0}".format(d))
+            self.draw_roots1(d)
+
+    def save_image(self, outfile):
+        """Save image to the given output file in PNG format."""
+        self.image.save(outfile, 'PNG', dpi = (300, 300))